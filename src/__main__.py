@@ -20,7 +20,11 @@ from src.discriminators.binding.repositories.factory import repository_factory
 from src.discriminators.binding.repositories.languages.factory import (
     get_repository_language,
 )
-from src.discriminators.factory import DiscriminatorTypes, discriminator_factory
+from src.discriminators.factory import (
+    DiscriminatorTypes,
+    discriminator_factory,
+    get_discriminator,
+)
 from src.discriminators.file_types import FileChanges
 from src.driver import generate_driver
 from src.git_progress import CloneProgress
@@ -169,9 +173,19 @@ def drill(): ...
 @click.option("--url", "-u", type=str, required=True)
 @click.option("--output", "-o", type=str, required=True)
 @click.option("--reverse-squash", "-e", type=bool, is_flag=True, default=False)
-def repository(url: str, output: str, reverse_squash: bool) -> None:
+@click.option(
+    "--commit-count-cache",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON file reusing the commit counts of local repositories",
+)
+def repository(
+    url: str, output: str, reverse_squash: bool, commit_count_cache: Optional[str]
+) -> None:
     with rich.progress.Progress(console=console) as progress:
-        driller.drill_repository(url, output, progress, reverse_squash)
+        driller.drill_repository(
+            url, output, progress, reverse_squash, commit_count_cache=commit_count_cache
+        )
 
 
 @drill.command()
@@ -185,10 +199,17 @@ def repository(url: str, output: str, reverse_squash: bool) -> None:
     required=True,
 )
 @click.option("--reverse-squash", "-e", type=bool, is_flag=True, default=False)
+@click.option(
+    "--commit-count-cache",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON file reusing the commit counts of local repositories",
+)
 def repositories(
     input_file: str,
     output: tuple[str, str],
     reverse_squash: bool,
+    commit_count_cache: Optional[str],
 ) -> None:
     with open(input_file, "r") as f, rich.progress.Progress(
         rich.progress.SpinnerColumn(),
@@ -208,6 +229,7 @@ def repositories(
                 output[1].replace(output[0], row["name"]),
                 progress,
                 reverse_squash,
+                commit_count_cache=commit_count_cache,
             )
 
 
@@ -343,7 +365,7 @@ def run_discriminator(
     console.print(f"Repository language is {language}")
     repository = repository_factory[language](dir)
     binding_strategy = strategy_factory[binding](repository)
-    discriminator = discriminator_factory[discriminator_type](data, binding_strategy)
+    discriminator = get_discriminator(discriminator_type)(data, binding_strategy)
     statistics = discriminator.statistics
 
     console.print(statistics.output())
@@ -1,23 +1,23 @@
 import os
 import time
+from collections import defaultdict
 from dataclasses import dataclass
 from functools import cached_property
 
 import openai
 import rich.progress
-from pydriller import ModificationType
 
-from .binding.file_types import FileName, SourceFile
+from .binding.file_types import FileName, SourceFile, TestFile
 from .binding.strategy import BindingStrategy
 from .discriminator import Discriminator, Statistics
 from .file_types import FileChanges, FileNumber
-from .transaction import Commit, CommitFileChange, TransactionBuilder, TransactionLog
+from .transaction import TransactionBuilder, TransactionLog
 
 console = rich.console.Console()
 TPM = 100000
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Stats:
     source: SourceFile
     is_tfd: bool
@@ -29,16 +29,17 @@ class TestedFirstStatistics(Statistics):
 
     @cached_property
     def test_first(self) -> set[SourceFile]:
-        return set(
-            [statistic.source for statistic in self.test_statistics if statistic.is_tfd]
-        )
+        return {
+            statistic.source for statistic in self.test_statistics if statistic.is_tfd
+        }
 
     @cached_property
     def non_test_first(self) -> set[SourceFile]:
-        return (
-            set([statistic.source for statistic in self.test_statistics])
-            - self.test_first
-        )
+        return {
+            statistic.source
+            for statistic in self.test_statistics
+            if not statistic.is_tfd
+        }
 
     def output(self) -> str:
         return (
@@ -58,22 +59,6 @@ class LLMDiscriminator(Discriminator):
             TransactionBuilder.group_file_changes(self.commit_data)
         )
 
-    def adds_features(self, file_commit_info: CommitFileChange) -> bool:
-        """Does this commit add new methods to the file?"""
-        if file_commit_info.modification_type == ModificationType.ADD:
-            return True  # auto-accept file creations
-        if file_commit_info.modification_type != ModificationType.MODIFY:
-            return False  # not a modification
-        if len(file_commit_info.new_methods) == 0:
-            return False  # not a modification with method additions
-        return True
-
-    def get_fc(self, commit: Commit, file_number: FileNumber) -> CommitFileChange:
-        for fc in commit.files:
-            if fc.file_number == file_number:
-                return fc
-        raise ValueError("File not found in commit")
-
     def query_tfd(
         self, source_id: FileNumber, commit_list: list[tuple[int, set[FileNumber]]]
     ) -> bool:
@@ -109,27 +94,31 @@ class LLMDiscriminator(Discriminator):
     def statistics(self) -> TestedFirstStatistics:
         graph = self.file_binder.graph()
         output = []
+        # the links are inverted on every access, so they are only built once
+        links = graph.source_to_test_links
+        name_to_id = self.transaction.mapping.name_to_id
+        feature_commits = self.transaction.transactions.feature_commits
+        # tests are linked to many source files, so each is only resolved once
+        test_ids: dict[TestFile, FileNumber] = {}
         for source_file in rich.progress.track(graph.source_files):
-            if source_file not in graph.source_to_test_links:
+            linked_tests = links.get(source_file)
+            if linked_tests is None:
                 continue  # no tests for this source file
 
             # collect relevant commits
-            commit_list: list[tuple[int, set[FileNumber]]] = []
             source_path = FileName(source_file.path)
-            source_id = self.transaction.mapping.name_to_id[source_path]
+            source_id = name_to_id[source_path]
             file_collection = [source_id]
-            for test_file in graph.source_to_test_links[source_file]:
-                test_path = FileName(test_file.path)
-                file_collection.append(self.transaction.mapping.name_to_id[test_path])
-            for commit in self.transaction.transactions.commits:
-                commit_data: set[FileNumber] = set()
-                for file_number in file_collection:
-                    if file_number in commit.file_numbers:
-                        file_commit = self.get_fc(commit, file_number)
-                        if self.adds_features(file_commit):
-                            commit_data.add(file_number)
-                if len(commit_data) > 0:
-                    commit_list.append((commit.number, commit_data))
+            for test_file in linked_tests:
+                if test_file not in test_ids:
+                    test_ids[test_file] = name_to_id[FileName(test_file.path)]
+                file_collection.append(test_ids[test_file])
+            # only the commits adding features to the collected files are visited
+            commit_data: dict[int, set[FileNumber]] = defaultdict(set)
+            for file_number in file_collection:
+                for commit_number in feature_commits.get(file_number, []):
+                    commit_data[commit_number].add(file_number)
+            commit_list = sorted(commit_data.items())
 
             # check if the source file is tested first
             is_tfd = self.query_tfd(source_id, commit_list)
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from functools import cached_property
-from typing import Iterator, Optional, Self
+from typing import Iterator, Self
 
 from src.discriminators.file_types import FileChanges
 
@@ -19,15 +18,6 @@ class Branch:
     head: CommitNode
     tail: CommitNode
 
-    @cached_property
-    def commits(self) -> set[str]:
-        node = self.tail
-        commits = {self.head.hash}
-        while node.hash != self.head.hash:
-            commits.add(node.hash)
-            node = node.parents[0]
-        return commits
-
 
 class CommitAligner:
     """
@@ -63,13 +53,15 @@ class CommitAligner:
             tail = tail.parents[0]
         assert tail == self._main_branch.head
 
-    def get_successor(self, node: CommitNode) -> Optional[CommitNode]:
-        current_node = self._main_branch.tail
-        successor = None
-        while current_node.hash != node.hash:
-            successor = current_node
-            current_node = current_node.parents[0]
-        return successor
+    def _successors(self) -> dict[str, CommitNode]:
+        """Maps the hash of each commit on the main branch to its successor, so
+        that the branch can be walked from head to tail without a scan per step"""
+        successors: dict[str, CommitNode] = dict()
+        node = self._main_branch.tail
+        while node.parents:
+            successors[node.parents[0].hash] = node
+            node = node.parents[0]
+        return successors
 
     def _create_commit_from_changes(
         self, commit_hash: str, nodes: dict[str, CommitNode]
@@ -145,11 +137,13 @@ class CommitAligner:
 
         return Branch(head=nodes[commits[0][0]], tail=nodes[commits[-1][0]])
 
-    def _trace_path_back_to_main(self, tail: CommitNode) -> Branch:
+    def _trace_path_back_to_main(self, tail: CommitNode, visited: set[str]) -> Branch:
         """Traces the path back to the main branch
 
         Args:
             tail (CommitNode): The tail of the branch to trace back to main
+            visited (set[str]): The set of already visited nodes, which holds every
+                main branch commit that precedes the merge
 
         Returns (Branch): The branch that was traced back to main
 
@@ -164,7 +158,7 @@ class CommitAligner:
             at B and the tail at E
         """
         node = tail
-        while node.parents[0].hash not in self._main_branch.commits:
+        while node.parents[0].hash not in visited:
             node = node.parents[0]
         return Branch(node, tail)
 
@@ -211,30 +205,38 @@ class CommitAligner:
         merge commit, therefore any branching off the branch is also inlined
         """
         visited = set()
+        successors = self._successors()
         current_node = self._main_branch.head
         while current_node is not None:
             visited.add(current_node.hash)
             if len(current_node.parents) != 2:
                 # we only want the merge commits
-                current_node = self.get_successor(current_node)
+                current_node = successors.get(current_node.hash)
                 continue
 
             if current_node.parents[1].hash in visited:
                 path = Branch(current_node.parents[1], current_node.parents[1])
             else:
-                path = self._trace_path_back_to_main(current_node.parents[1])
+                path = self._trace_path_back_to_main(current_node.parents[1], visited)
 
             stitched_branch = self._stitch_path(current_node, path, visited)
-            visited.update(stitched_branch.commits)
+
+            # visit the stitched branch, relinking the successors along it
+            node = stitched_branch.tail
+            while True:
+                visited.add(node.hash)
+                successors[node.parents[0].hash] = node
+                if node is stitched_branch.head:
+                    break
+                node = node.parents[0]
 
             # go back to the start of the branch
             current_node = stitched_branch.head
 
     def __iter__(self) -> Iterator[list[FileChanges]]:
         """Converts the branches into rows of FileChanges"""
-        rows: list[list[FileChanges]] = []
-        current_node: Optional[CommitNode] = self._main_branch.head
-        while current_node is not None:
-            rows.append(current_node.changes)
-            current_node = self.get_successor(current_node)
-        return iter(rows)
+        nodes: list[CommitNode] = [self._main_branch.tail]
+        while nodes[-1].parents:
+            nodes.append(nodes[-1].parents[0])
+        for node in reversed(nodes):
+            yield node.changes
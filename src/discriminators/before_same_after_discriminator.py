@@ -13,7 +13,7 @@ from src.discriminators.transaction import TransactionBuilder, TransactionLog
 console = rich.console.Console()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TestStatistics:
     test: TestFile
     before: list[SourceFile]
@@ -79,23 +79,29 @@ class BeforeSameAfterDiscriminator(Discriminator):
         print(f"Graph has {len(graph.test_files)} test files")
         print(f"Graph has {len(graph.source_files)} source files")
         print(f"Graph has {len(graph.test_to_source_links)} links")
+        name_to_id = self.transaction.mapping.name_to_id
+        first_occurrence = self.transaction.transactions.first_occurrence
+        # source files are linked to many tests, so each is only resolved once
+        introduced: dict[SourceFile, int] = {}
         for test in rich.progress.track(graph.test_files):
             path = FileName(test.path)
-            file_number = self.transaction.mapping.name_to_id[path]
-            base_commit = self.transaction.transactions.first_occurrence(file_number)
+            file_number = name_to_id[path]
+            base_commit = first_occurrence(file_number)
             assert base_commit is not None, f"Test file not found {test.name} @ {path}"
             before, after, same = [], [], []
             for source_file in graph.test_to_source_links[test]:
-                path = FileName(source_file.path)
-                file_number = self.transaction.mapping.name_to_id[path]
-                assert (
-                    file_number is not None
-                ), f"Source file not found {source_file.name} @ {path}"
-                commit = self.transaction.transactions.first_occurrence(file_number)
-                assert commit
-                if commit.number < base_commit.number:
+                if source_file not in introduced:
+                    path = FileName(source_file.path)
+                    file_number = name_to_id[path]
+                    assert (
+                        file_number is not None
+                    ), f"Source file not found {source_file.name} @ {path}"
+                    commit = first_occurrence(file_number)
+                    assert commit
+                    introduced[source_file] = commit.number
+                if introduced[source_file] < base_commit.number:
                     before.append(source_file)
-                elif commit.number == base_commit.number:
+                elif introduced[source_file] == base_commit.number:
                     same.append(source_file)
                 else:
                     after.append(source_file)
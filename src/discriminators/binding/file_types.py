@@ -13,8 +13,9 @@ class ProgramFile:
     project: str = field(compare=False, hash=False)  # abs to repo/project
     path: str = field(compare=True, hash=True)  # relative to project
 
-    @property
+    @cached_property
     def name(self) -> FileName:
+        # the path never changes, so it is only split once per file
         return FileName(os.path.basename(self.path))
 
     @cached_property
@@ -36,7 +37,7 @@ class ProgramFile:
         except UnicodeError:
             return self._read_source_code(encoding=self.encoding)
 
-    @property
+    @cached_property
     def abs_path(self) -> str:
         return os.path.join(self.project, self.path)
 
@@ -20,13 +20,13 @@ class ImportStrategy(BindingStrategy):
 
     @lru_cache
     def fetch_links(self, file: ProgramFile) -> set[SourceFile]:
-        links: set[SourceFile] = set()
-        for source_file in self.repository.files.source_files:
-            if self.repository.language.import_name_of(
-                source_file
-            ) in self.repository.language.fetch_import_names(file):
-                links.add(source_file)
-        return links
+        language = self.repository.language
+        imports = language.fetch_import_names(file)
+        return {
+            source_file
+            for source_file in self.repository.files.source_files
+            if language.import_name_of(source_file) in imports
+        }
 
     def graph(self) -> Graph:
         files = self.repository.files
@@ -8,18 +8,18 @@ from src.discriminators.binding.repositories.languages.language import Language
 
 class JavaLanguage(Language):
     SUFFIX: str = ".java"
+    METHOD_PATTERN: re.Pattern[str] = re.compile(
+        r"^\s*(public|private|protected)\s+(?:static\s+)?(?:final\s+)"
+        + r"?[\w<>[\],\s]+\s+\w+\s*\([^)]*\)"
+    )
+    # Match patterns like: new ClassName() or ClassName.method()
+    CLASS_PATTERN: re.Pattern[str] = re.compile(r"(?:new\s+(\w+)|(\w+)\.[\w<>]+\()")
 
     @staticmethod
     def get_defined_method(line: str) -> Optional[str]:
-        pattern = (
-            r"^\s*(public|private|protected)\s+(?:static\s+)?(?:final\s+)"
-            + r"?[\w<>[\],\s]+\s+\w+\s*\([^)]*\)"
-        )
-        if bool(re.match(pattern, line)):
-            match = re.match(pattern, line)
-            if match is None:
-                return None
-            method_parts = line[match.span()[0] : match.span()[1]].split()
+        match = JavaLanguage.METHOD_PATTERN.match(line)
+        if match is not None:
+            method_parts = match.group().split()
             method_name: Optional[str] = None
             for i, part in enumerate(method_parts):
                 if "(" in part:
@@ -36,11 +36,9 @@ class JavaLanguage(Language):
     @staticmethod
     def get_classes_used(diffs: dict[str, list[tuple[int, str]]]) -> set[str]:
         new_lines: list[tuple[int, str]] = diffs["added"]
-        # Match patterns like: new ClassName() or ClassName.method()
-        class_pattern = r"(?:new\s+(\w+)|(\w+)\.[\w<>]+\()"
         classes_referenced = set()
         for _, line in new_lines:
-            matches = re.finditer(class_pattern, line)
+            matches = JavaLanguage.CLASS_PATTERN.finditer(line)
             for match in matches:
                 # Group 1 is from 'new ClassName()'
                 # Group 2 is from 'ClassName.method()'
@@ -57,7 +55,7 @@ class JavaLanguage(Language):
                 return (
                     line.replace("package ", "").replace(";", "").strip()
                     + "."
-                    + file.name.replace(".java", "")
+                    + file.name.removesuffix(JavaLanguage.SUFFIX)
                 )
 
         return None  # default package
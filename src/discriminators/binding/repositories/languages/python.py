@@ -8,15 +8,21 @@ from src.discriminators.binding.repositories.languages.language import Language
 
 class PythonLanguage(Language):
     SUFFIX: str = ".py"
+    METHOD_PATTERN: re.Pattern[str] = re.compile(
+        r"^\s*(def)" + r"?[\w<>[\],\s]+\s+\w+\s*\([^)]*\)"
+    )
+    # Match patterns like: ClassName() or ClassName.method()
+    CLASS_PATTERN: re.Pattern[str] = re.compile(r"(\w+)\(\)|(\w+)\.[\w]+\(")
+    IMPORT_PATTERN: re.Pattern[str] = re.compile(r"import \w+(\.\w+)*")
+    FROM_IMPORT_PATTERN: re.Pattern[str] = re.compile(
+        r"from \w+(\.\w+)* import \w+(\s*,\s*\w+)*"
+    )
 
     @staticmethod
     def get_defined_method(line: str) -> Optional[str]:
-        pattern = r"^\s*(def)" + r"?[\w<>[\],\s]+\s+\w+\s*\([^)]*\)"
-        if bool(re.match(pattern, line)):
-            match = re.match(pattern, line)
-            if match is None:
-                return None
-            method_parts = line[match.span()[0] : match.span()[1]].split()
+        match = PythonLanguage.METHOD_PATTERN.match(line)
+        if match is not None:
+            method_parts = match.group().split()
             method_name: Optional[str] = None
             for i, part in enumerate(method_parts):
                 if "(" in part:
@@ -33,11 +39,9 @@ class PythonLanguage(Language):
     @staticmethod
     def get_classes_used(diffs: dict[str, list[tuple[int, str]]]) -> set[str]:
         new_lines: list[tuple[int, str]] = diffs["added"]
-        # Match patterns like: ClassName() or ClassName.method()
-        class_pattern = r"(\w+)\(\)|(\w+)\.[\w]+\("
         classes_referenced = set()
         for _, line in new_lines:
-            matches = re.finditer(class_pattern, line)
+            matches = PythonLanguage.CLASS_PATTERN.finditer(line)
             for match in matches:
                 # Group 1 is from 'new ClassName()'
                 # Group 2 is from 'ClassName.method()'
@@ -54,8 +58,8 @@ class PythonLanguage(Language):
     @staticmethod
     def is_import(line: str) -> bool:
         "via regex, checks if it follows the form import module_name(.module_name)*"
-        return bool(re.match(r"import \w+(\.\w+)*", line)) or bool(
-            re.match(r"from \w+(\.\w+)* import \w+(\s*,\s*\w+)*", line)
+        return bool(PythonLanguage.IMPORT_PATTERN.match(line)) or bool(
+            PythonLanguage.FROM_IMPORT_PATTERN.match(line)
         )
 
     @staticmethod
@@ -20,9 +20,8 @@ class Files(NamedTuple):
 
 
 def _all_files_in_directory(directory: str, suffix: str) -> Generator[str, None, None]:
-    for root, dirnames, files in os.walk(directory):
-        for dir in dirnames:
-            yield from _all_files_in_directory(os.path.join(root, dir), suffix)
+    # os.walk already descends into every subdirectory
+    for root, _, files in os.walk(directory):
         for file in files:
             if file.endswith(suffix):
                 yield root + os.path.sep + file
@@ -47,14 +46,9 @@ class Repository(ABC, RepositoryProtocol):
             for path in _all_files_in_directory(self.root, self.language.SUFFIX)
         )
 
-    @cached_property
+    @property
     def source_files(self) -> set[SourceFile]:
-        test_paths = {file.path for file in self.tests}
-        return {
-            SourceFile(project=file.project, path=file.path)
-            for file in self.all_files
-            if file.path not in test_paths
-        }
+        return self.files.source_files
 
     @property
     @abstractmethod
@@ -63,13 +57,17 @@ class Repository(ABC, RepositoryProtocol):
     @abstractmethod
     def is_test(self, file: ProgramFile) -> bool: ...
 
-    @cached_property
+    @property
     def tests(self) -> set[TestFile]:
-        return {
-            TestFile(project=file.project, path=file.path)
-            for file in filter(self.is_test, self.all_files)
-        }
+        return self.files.test_files
 
     @cached_property
     def files(self) -> Files:
-        return Files(source_files=self.source_files, test_files=self.tests)
+        # every file is classified once, into either the tests or the source files
+        files = Files(source_files=set(), test_files=set())
+        for file in self.all_files:
+            if self.is_test(file):
+                files.test_files.add(TestFile(project=file.project, path=file.path))
+            else:
+                files.source_files.add(SourceFile(project=file.project, path=file.path))
+        return files
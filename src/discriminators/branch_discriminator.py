@@ -1,4 +1,5 @@
 import csv
+import operator
 import os
 from dataclasses import dataclass
 from functools import cached_property
@@ -41,26 +42,12 @@ class Branch:
             node = node.parents[0]
         return commits
 
-    def make_log(self) -> TransactionLog:
-        builder = TransactionBuilder()
-        node = self.tail
-        changes = []
-        while node.hash != self.head.hash:
-            changes.append(node.changes)
-            node = node.parents[0]
-        changes.append(node.changes)
-        for change in reversed(changes):
-            builder.process(change)
-        results = builder.build()
-        return TransactionLog(
-            transactions=results.transactions, mapping=results.mapping
-        )
-
 
 class CommitLog:
     def __init__(self, changes: list[tuple[str, list[FileChanges]]]):
         self._commits = changes
         self._nodes: dict[str, CommitNode] = {}
+        self._branch_paths: dict[tuple[str, str], list[CommitNode]] = {}
         self._main_branch = self._make_tree()
         root_commits = self._root_commits()
         assert (
@@ -78,10 +65,13 @@ class CommitLog:
         ]
 
     def _locate_changes(self, commit_hash: str) -> list[FileChanges]:
-        for idx in range(len(self._commits)):
-            if self._commits[idx][0] == commit_hash:
-                return self._commits[idx][1]
-        raise ValueError(f"Commit with hash {commit_hash} not found")
+        changes = next(
+            (changes for commit, changes in self._commits if commit == commit_hash),
+            None,
+        )
+        if changes is None:
+            raise ValueError(f"Commit with hash {commit_hash} not found")
+        return changes
 
     def _create_commit_from_changes(
         self,
@@ -157,10 +147,42 @@ class CommitLog:
             at B and the tail at E
         """
         node = tail
+        path = [node]
         while node.parents[0].hash not in self._main_branch.commits:
             node = node.parents[0]
+            path.append(node)
+        self._branch_paths[(node.hash, tail.hash)] = path
         return Branch(node, tail)
 
+    def _branch_path(self, branch: Branch) -> list[CommitNode]:
+        """The nodes of the branch ordered from the tail to the head, reusing the
+        walk carried out when the branch was traced back to main"""
+        key = (branch.head.hash, branch.tail.hash)
+        if key not in self._branch_paths:
+            node = branch.tail
+            path = [node]
+            while node.hash != branch.head.hash:
+                node = node.parents[0]
+                path.append(node)
+            self._branch_paths[key] = path
+        return self._branch_paths[key]
+
+    def build_transaction_log_for(self, branch: Branch) -> TransactionLog:
+        """Builds the transaction log containing only the commits of the branch
+
+        Args:
+            branch (Branch): The branch to build the log for
+
+        Returns (TransactionLog): The log of the branch commits, from head to tail
+        """
+        builder = TransactionBuilder()
+        for node in reversed(self._branch_path(branch)):
+            builder.process(node.changes)
+        results = builder.build()
+        return TransactionLog(
+            transactions=results.transactions, mapping=results.mapping
+        )
+
     def get_successor(self, node: CommitNode) -> Optional[CommitNode]:
         current_node = self._main_branch.tail
         successor = None
@@ -236,30 +258,33 @@ class BranchDiscriminator(Discriminator):
     commit_data: list[FileChanges]
     file_binder: BindingStrategy
 
-    def process_branch(self, branch: Branch, graph: Graph) -> BranchResults:
-        log = branch.make_log()
+    def process_branch(
+        self, branch: Branch, log: TransactionLog, graph: Graph
+    ) -> BranchResults:
+        name_to_id = log.mapping.name_to_id
+        first_occurrence = log.transactions.first_occurrence
         testing_subset: set[TestFile] = {
-            file for file in graph.test_files if file.path in log.mapping.name_to_id
+            file for file in graph.test_files if file.path in name_to_id
         }
         source_subset: set[SourceFile] = {
-            file for file in graph.source_files if file.path in log.mapping.name_to_id
+            file for file in graph.source_files if file.path in name_to_id
         }
         output = []
         for test in rich.progress.track(testing_subset):
             path = FileName(test.path)
-            file_number = log.mapping.name_to_id[path]
-            base_commit = log.transactions.first_occurrence(file_number)
+            file_number = name_to_id[path]
+            base_commit = first_occurrence(file_number)
             assert base_commit is not None, f"File not found {test.name} @ {path}"
             before, same, after = [], [], []
             for source_file in graph.test_to_source_links[test].intersection(
                 source_subset
             ):
                 path = FileName(source_file.path)
-                file_number = log.mapping.name_to_id[path]
+                file_number = name_to_id[path]
                 assert (
                     file_number is not None
                 ), f"File not found {source_file.name} @ {path}"
-                commit = log.transactions.first_occurrence(file_number)
+                commit = first_occurrence(file_number)
                 assert commit
                 if commit.number < base_commit.number:
                     before.append(source_file)
@@ -290,12 +315,15 @@ class BranchDiscriminator(Discriminator):
             [
                 (commit_hash, list(changes))
                 for commit_hash, changes in groupby(
-                    self.commit_data, lambda x: x["hash"]
+                    self.commit_data, operator.itemgetter("hash")
                 )
             ]
         )
         branches = log.all_merge_branches_into_main()
-        stats = [self.process_branch(branch, graph) for branch in branches]
+        stats = [
+            self.process_branch(branch, log.build_transaction_log_for(branch), graph)
+            for branch in branches
+        ]
 
         return BranchStatistics(results=stats)
 
@@ -1,50 +1,107 @@
-from collections import defaultdict
-from dataclasses import dataclass
+import bisect
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Optional
+from typing import Iterator
 
 import rich.progress
-from pydriller import ModificationType
 
 from src.discriminators.binding.graph import Graph
 
-from .binding.file_types import FileName, SourceFile, TestFile
+from .binding.file_types import FileName, ProgramFile, SourceFile, TestFile
 from .binding.strategy import BindingStrategy
 from .discriminator import Discriminator, Statistics
 from .file_types import FileChanges, FileNumber
-from .transaction import Commit, CommitFileChange, TransactionBuilder, TransactionLog
+from .transaction import TransactionBuilder, TransactionLog
 
 console = rich.console.Console()
 
+# below this many source files the cost of starting worker processes outweighs
+# the work done by them, so the statistics are computed in process
+PARALLEL_THRESHOLD = 64
 
-@dataclass(frozen=True)
+# the commits ending each window of a source file, and the commits adding
+# features to each of its tests
+SourceJob = tuple[list[int], list[tuple[TestFile, list[int]]]]
+
+
+# outcome of each commit of a source file, as stored in Stats.outcomes
+UNTESTED = 0
+TESTED_BEFORE = 1
+TESTED_SAME_COMMIT = 2
+
+
+@dataclass(frozen=True, slots=True)
 class Stats:
     changed_tests_per_commit: dict[int, dict[TestFile, list[int]]]
+    # one outcome per commit of the source file, packed so that the counts
+    # needed by the thresholds do not have to walk the nested hits
+    outcomes: bytearray = field(default_factory=bytearray)
 
-    @cached_property
+    def __post_init__(self) -> None:
+        if len(self.outcomes) != len(self.changed_tests_per_commit):
+            self.outcomes[:] = bytes(
+                self._outcome(commit_no, hits)
+                for commit_no, hits in self.changed_tests_per_commit.items()
+            )
+
+    @staticmethod
+    def _outcome(commit_no: int, hits: dict[TestFile, list[int]]) -> int:
+        if not hits:
+            return UNTESTED
+        # hits are in ascending order and bounded by the source commit
+        if any(commits[-1] == commit_no for commits in hits.values()):
+            return TESTED_SAME_COMMIT
+        return TESTED_BEFORE
+
+    def record(self, commit_no: int, hits: dict[TestFile, list[int]]) -> None:
+        """Record the test files updated up to the commit of the source file"""
+        self.changed_tests_per_commit[commit_no] = hits
+        self.outcomes.append(self._outcome(commit_no, hits))
+
+    @property
     def tfd_count(self) -> int:
-        return sum(
-            bool(self.changed_tests_per_commit[commit])
-            for commit in self.changed_tests_per_commit
-        )
+        return len(self.outcomes) - self.outcomes.count(UNTESTED)
 
     def is_tfd(self, threshold: float) -> bool:
         """Each time the source is committed, at least one test file updated
         with new methods that call to the source file"""
-        if not self.changed_tests_per_commit:
+        if not self.outcomes:
             return False
-        return self.tfd_count / len(self.changed_tests_per_commit) >= threshold
+        if threshold == 1.0:
+            # stops at the first untested commit rather than counting them all
+            return UNTESTED not in self.outcomes
+        return self.tfd_count / len(self.outcomes) >= threshold
 
     def same_commit(self) -> float:
         """Percentage of test files updated in the same commit as the source"""
         assert self.tfd_count, "is_tfd called first"
-        same_commit = 0
-        for commit_no in self.changed_tests_per_commit:
-            for test_file in self.changed_tests_per_commit[commit_no]:
-                if commit_no in self.changed_tests_per_commit[commit_no][test_file]:
-                    same_commit += 1
-                    break
-        return same_commit / self.tfd_count
+        return self.outcomes.count(TESTED_SAME_COMMIT) / self.tfd_count
+
+
+def track_windows(
+    window_ends: list[int], test_additions: list[tuple[TestFile, list[int]]]
+) -> Stats:
+    """Find the test files updated with new methods within each window of a source
+    file, where every window ends at a commit of the source file.
+
+    The windows are contiguous, so the feature additions of every test are walked
+    once, with a cursor per test that only ever moves forwards.
+    """
+    stats = Stats({})
+    cursors = [0] * len(test_additions)
+    for window_end in window_ends:
+        hits: dict[TestFile, list[int]] = {}
+        for position, (test_file, additions) in enumerate(test_additions):
+            cursor = cursors[position]
+            if cursor == len(additions) or additions[cursor] > window_end:
+                continue  # the test is not updated within the window
+            end = bisect.bisect_right(additions, window_end, cursor)
+            hits[test_file] = additions[cursor:end]
+            cursors[position] = end
+        stats.record(window_end, hits)
+    return stats
 
 
 @dataclass(frozen=True)
@@ -55,16 +112,18 @@ class TestedFirstStatistics(Statistics):
     def test_first(self, threshold: float) -> set[SourceFile]:
         """Set of source files which are classed as having TFD"""
         return {
-            statistic
-            for statistic in self.test_statistics.keys()
-            if self.test_statistics[statistic].is_tfd(threshold)
+            source_file
+            for source_file, statistic in self.test_statistics.items()
+            if statistic.is_tfd(threshold)
         }
 
     def non_test_first(self, threshold: float) -> set[SourceFile]:
         """Set of source files which are classed as not having TFD"""
         return {
-            statistic for statistic in self.test_statistics.keys()
-        } - self.test_first(threshold)
+            source_file
+            for source_file, statistic in self.test_statistics.items()
+            if not statistic.is_tfd(threshold)
+        }
 
     @property
     def untested_source_files(self) -> set[SourceFile]:
@@ -87,10 +146,12 @@ class TestedFirstStatistics(Statistics):
         string = ""
         for threshold in thresholds:
             test_first = self.test_first(threshold)
+            # the rest of the tracked source files are the non test first ones
+            test_elsewhere = len(self.test_statistics) - len(test_first)
             string += (
                 f"Threshold: {threshold}\n"
                 f"Test First Updates: {len(test_first)}\n"
-                + f"Test Elsewhere: {len(self.non_test_first(threshold))}\n"
+                + f"Test Elsewhere: {test_elsewhere}\n"
                 + f"Same Commit: {self.same_commit_count(test_first)}%\n"
             )
         return string + f"Untested Files: {len(self.untested_source_files)}"
@@ -107,105 +168,104 @@ class CommitSequenceDiscriminator(Discriminator):
             TransactionBuilder.group_file_changes(self.commit_data)
         )
 
-    def adds_features(self, file_commit_info: CommitFileChange) -> bool:
-        """Does this commit add new methods to the file?"""
-        if file_commit_info.modification_type == ModificationType.ADD:
-            return True  # auto-accept file creations
-        if file_commit_info.modification_type != ModificationType.MODIFY:
-            return False  # not a modification
-        if len(file_commit_info.new_methods) == 0:
-            return False  # not a modification with method additions
-        return True
-
-    def get_fc(self, commit: Commit, file_number: FileNumber) -> CommitFileChange:
-        for fc in commit.files:
-            if fc.file_number == file_number:
-                return fc
-        raise ValueError("File not found in commit")
-
-    def next_commit(
-        self, file_number: FileNumber, commits: list[Commit]
-    ) -> Optional[Commit]:
-        """Find the next commit which modifies the file with a feature addition"""
-        for commit in commits:
-            if file_number not in commit.file_numbers:
-                continue
+    @cached_property
+    def graph(self) -> Graph:
+        """The links between the source and test files, which are bound once as
+        binding strategies may read every file of the repository"""
+        return self.file_binder.graph()
 
-            file_commit = self.get_fc(commit, file_number)
-            if self.adds_features(file_commit):
-                return commit
-        return None
-
-    def tfd_iterations(
-        self,
-        commit_range: tuple[int, int],
-        tests: set[TestFile],
-    ) -> dict[TestFile, list[int]]:
-        """Within the range of commits, find the test files which are updated
-        with new methods that call to the source file"""
-        hits: dict[TestFile, list[int]] = defaultdict(list)
-        for commit in self.transaction.transactions.commits[
-            commit_range[0] : commit_range[1] + 1
-        ]:
-            for test_file in tests:
-                path = FileName(test_file.path)
-                test_id = self.transaction.mapping.name_to_id[path]
-                if test_id not in commit.file_numbers:
-                    continue
-
-                file_commit = self.get_fc(commit, test_id)
-                if not self.adds_features(file_commit):
-                    continue
-
-                hits[test_file].append(commit.number)
-        return hits
+    def file_id(
+        self, file: ProgramFile, file_ids: dict[ProgramFile, FileNumber]
+    ) -> FileNumber:
+        """The file number of the file within the transaction log, memoized in
+        file_ids as the same files are resolved for every linked source file"""
+        file_id = file_ids.get(file)
+        if file_id is None:
+            path = FileName(file.path)
+            file_id = file_ids[file] = self.transaction.mapping.name_to_id[path]
+        return file_id
+
+    def source_job(
+        self, source_id: FileNumber, tests: list[tuple[TestFile, FileNumber]]
+    ) -> SourceJob:
+        """The windows of the source file, and the feature additions of its tests.
+
+        The first window ends when the source file first occurs, and the next
+        windows end at each later feature addition to the source file.
+        """
+        transactions = self.transaction.transactions
+        feature_commits = transactions.feature_commits
+        test_additions = [
+            (test_file, feature_commits.get(test_id, []))
+            for test_file, test_id in tests
+        ]
+        # the builder numbers the commits by their position in the log
+        first_commit = transactions.commits_touching[source_id][0]
+        if transactions.commits[first_commit].files_by_number[source_id].deletes_file:
+            return [], test_additions  # deleted when it first occurs
+        source_additions = feature_commits.get(source_id, [])
+        later = bisect.bisect_right(source_additions, first_commit)
+        return [first_commit, *source_additions[later:]], test_additions
 
     @property
     def statistics(self) -> TestedFirstStatistics:
         """Get set of every source file feature addition which are tested first"""
-        output = {}
-        graph = self.file_binder.graph()
+        graph = self.graph
         print(f"Graph has {len(graph.test_files)} test files")
         print(f"Graph has {len(graph.source_files)} source files")
         print(f"Graph has {len(graph.test_to_source_links)} links")
-        commit_count = len(self.transaction.transactions.commits)
-        for source_file in rich.progress.track(graph.source_files):
-            # setup the source file for tracking
-            if source_file not in graph.source_to_test_links:
+        links = graph.source_to_test_links
+
+        # source files without tests, or which never occur in a commit, have
+        # nothing to track
+        commits_touching = self.transaction.transactions.commits_touching
+        file_ids: dict[ProgramFile, FileNumber] = {}
+        source_files: list[SourceFile] = []
+        jobs: list[SourceJob] = []
+        for source_file in graph.source_files:
+            linked_tests = links.get(source_file)
+            if linked_tests is None:
                 continue
-            path = FileName(source_file.path)
-            source_id = self.transaction.mapping.name_to_id[path]
-            stats = Stats({})
-            last_commit = self.transaction.transactions.commits[0]
-            this_commit: Optional[Commit] = (
-                self.transaction.transactions.first_occurrence(source_id)
-            )
-            if this_commit is None:
+            source_id = self.file_id(source_file, file_ids)
+            if source_id not in commits_touching:
                 continue
+            # linked test files are a set, so they are ordered by file number to
+            # record the hits in the same order on every run
+            tests = sorted(
+                (
+                    (test_file, self.file_id(test_file, file_ids))
+                    for test_file in linked_tests
+                ),
+                key=lambda test: test[1],
+            )
+            source_files.append(source_file)
+            jobs.append(self.source_job(source_id, tests))
+
+        results: list[Stats] = []
+        with contextlib.ExitStack() as stack:
+            if len(jobs) < PARALLEL_THRESHOLD:
+                tracked: Iterator[Stats] = map(_track_job, jobs)
+            else:
+                # the jobs carry the commit numbers they need, so the workers are
+                # never sent the commit data or the transaction log. They are all
+                # submitted before the progress bar starts its refresh thread, as
+                # the pool forks its workers on the first submission
+                executor = stack.enter_context(ProcessPoolExecutor())
+                tracked = executor.map(_track_job, jobs, chunksize=32)
+
+            # the bar is only advanced in this process, and redrawn a few times a
+            # second rather than after every source file
+            with rich.progress.Progress(
+                console=console, refresh_per_second=4, transient=True
+            ) as progress:
+                task = progress.add_task("Tracking source files", total=len(jobs))
+                for result in tracked:
+                    results.append(result)
+                    progress.advance(task)
+        return TestedFirstStatistics(
+            test_statistics=dict(zip(source_files, results)), graph=graph
+        )
+
 
-            # until the file is deleted or the last commit is reached
-            while (
-                this_commit is not None
-                and self.get_fc(this_commit, source_id).modification_type
-                != ModificationType.DELETE
-                and last_commit.number <= commit_count - 1
-            ):
-                # find test files updated with new methods calling to the source file
-                hits = self.tfd_iterations(
-                    commit_range=(last_commit.number, this_commit.number),
-                    tests=graph.source_to_test_links[source_file],
-                )
-                stats.changed_tests_per_commit[this_commit.number] = hits
-
-                # setup next iteration with the next time this source file is committed
-                if this_commit.number == commit_count - 1:
-                    break
-                last_commit = self.transaction.transactions.commits[
-                    this_commit.number + 1
-                ]
-                this_commit = self.next_commit(
-                    source_id,
-                    self.transaction.transactions.commits[this_commit.number + 1 :],
-                )
-            output[source_file] = stats
-        return TestedFirstStatistics(test_statistics=output, graph=graph)
+def _track_job(job: SourceJob) -> Stats:
+    return track_windows(*job)
@@ -1,19 +1,29 @@
+import importlib
+from functools import cache
 from typing import Literal, Type
 
-from src.discriminators.before_same_after_discriminator import (
-    BeforeSameAfterDiscriminator,
-)
-from src.discriminators.branch_discriminator import BranchDiscriminator
-from src.discriminators.commit_seq_discriminator import CommitSequenceDiscriminator
 from src.discriminators.discriminator import Discriminator
-from src.discriminators.LLM_discriminator import LLMDiscriminator
 
 DiscriminatorTypes = Literal["before_same_after", "commit_sequence", "llm", "branch"]
 
 
-discriminator_factory: dict[DiscriminatorTypes, Type[Discriminator]] = {
-    "before_same_after": BeforeSameAfterDiscriminator,
-    "commit_sequence": CommitSequenceDiscriminator,
-    "llm": LLMDiscriminator,
-    "branch": BranchDiscriminator,
+# module and class of each discriminator, which are only imported when used as
+# they pull in heavy dependencies such as the OpenAI client
+discriminator_factory: dict[DiscriminatorTypes, tuple[str, str]] = {
+    "before_same_after": (
+        "src.discriminators.before_same_after_discriminator",
+        "BeforeSameAfterDiscriminator",
+    ),
+    "commit_sequence": (
+        "src.discriminators.commit_seq_discriminator",
+        "CommitSequenceDiscriminator",
+    ),
+    "llm": ("src.discriminators.LLM_discriminator", "LLMDiscriminator"),
+    "branch": ("src.discriminators.branch_discriminator", "BranchDiscriminator"),
 }
+
+
+@cache
+def get_discriminator(discriminator_type: DiscriminatorTypes) -> Type[Discriminator]:
+    module, name = discriminator_factory[discriminator_type]
+    return getattr(importlib.import_module(module), name)
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import itertools
 import operator
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
 from functools import cached_property
-from typing import Callable, NamedTuple, Optional, Self
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Self
 
 import pydriller
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from src.discriminators.align import CommitAligner
 from src.discriminators.binding.file_types import FileName
@@ -22,27 +25,31 @@ modification_map: dict[pydriller.ModificationType, str] = {
 }
 
 
-reverse_modification_map: dict[str, pydriller.ModificationType] = dict(
-    (item[1], item[0]) for item in list(modification_map.items())
-)
+file_number_of = operator.attrgetter("file_number")
 
 
-def logstr_to_set(string: str) -> set[str]:
-    string = string.strip().removeprefix("{").removesuffix("}")
-    strings = string.split(",")
-    for s in range(len(strings)):
-        strings[s] = strings[s].strip().removeprefix("'").removesuffix("'")
-    return set(strings)
-
-
-class CommitFileChange(BaseModel):
+@dataclass(frozen=True, eq=False, slots=True)
+class CommitFileChange:
     file_number: FileNumber
     modification_type: pydriller.ModificationType
-    new_methods: set[str]
-    classes_used: set[str]
+    new_methods: frozenset[str]
+    classes_used: frozenset[str]
+
+    @property
+    def adds_features(self) -> bool:
+        """Does this change add new methods to the file?"""
+        # enum members are singletons, so they are compared by identity
+        if self.modification_type is pydriller.ModificationType.ADD:
+            return True  # auto-accept file creations
+        if self.modification_type is not pydriller.ModificationType.MODIFY:
+            return False  # not a modification
+        if len(self.new_methods) == 0:
+            return False  # not a modification with method additions
+        return True
 
-    def __lt__(self, other: CommitFileChange) -> bool:
-        return self.file_number < other.file_number
+    @property
+    def deletes_file(self) -> bool:
+        return self.modification_type is pydriller.ModificationType.DELETE
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, CommitFileChange):
@@ -50,35 +57,74 @@ class CommitFileChange(BaseModel):
         return self.file_number == other.file_number
 
 
-class Commit(BaseModel):
-    number: int
+@dataclass(frozen=True)
+class Commit:
+    number: int  # index of the commit within Transactions.commits
     files: list[CommitFileChange]
 
-    @property
-    def file_numbers(self) -> list[FileNumber]:
-        return [file.file_number for file in self.files]
+    @cached_property
+    def files_by_number(self) -> dict[FileNumber, CommitFileChange]:
+        # reversed so the first change of a file number wins, as with a scan
+        return {file.file_number: file for file in reversed(self.files)}
 
 
 class TransactionMap(BaseModel):
     id_to_names: dict[FileNumber, list[FileName]]
+    # the inverse kept by the builder, when the mapping was built in memory
+    _name_to_id: Optional[dict[FileName, FileNumber]] = PrivateAttr(default=None)
 
     @cached_property
     def name_to_id(self) -> dict[FileName, FileNumber]:
+        """The file number of each name, a name listed under several files resolves
+        to the newest of them"""
+        if self._name_to_id is not None:
+            return self._name_to_id
         return {
-            FileName(name): FileNumber(k)
-            for k, v in self.id_to_names.items()
-            for name in v
+            name: file_number
+            for file_number, names in self.id_to_names.items()
+            for name in names
         }
 
 
 class Transactions(BaseModel):
     commits: list[Commit]
 
-    def first_occurrence(self, file_number: FileNumber) -> Optional[Commit]:
+    @cached_property
+    def file_columns(
+        self,
+    ) -> tuple[dict[FileNumber, list[int]], dict[FileNumber, list[int]]]:
+        """The commit numbers changing each file, and those adding features to each
+        file, collected together in a single pass over the commits"""
+        touching: dict[FileNumber, list[int]] = defaultdict(list)
+        features: dict[FileNumber, list[int]] = defaultdict(list)
         for commit in self.commits:
-            if file_number in commit.file_numbers:
-                return commit
-        return None
+            for file_number, change in commit.files_by_number.items():
+                touching[file_number].append(commit.number)
+                if change.adds_features:
+                    features[file_number].append(commit.number)
+        return dict(touching), dict(features)
+
+    @property
+    def commits_touching(self) -> dict[FileNumber, list[int]]:
+        """The numbers of the commits changing each file, in ascending order"""
+        return self.file_columns[0]
+
+    @property
+    def feature_commits(self) -> dict[FileNumber, list[int]]:
+        """The numbers of the commits adding features to each file, in ascending
+        order"""
+        return self.file_columns[1]
+
+    @cached_property
+    def first_occurrence_index(self) -> dict[FileNumber, Commit]:
+        """The earliest commit changing each file"""
+        return {
+            file_number: self.commits[numbers[0]]
+            for file_number, numbers in self.commits_touching.items()
+        }
+
+    def first_occurrence(self, file_number: FileNumber) -> Optional[Commit]:
+        return self.first_occurrence_index.get(file_number)
 
 
 class TransactionBuilderResult(NamedTuple):
@@ -95,34 +141,44 @@ class TransactionBuilder:
         self._id_counter: FileNumber = FileNumber(0)
         self._id_map: dict[FileName, FileNumber] = dict()
         self._name_map: dict[FileNumber, list[FileName]] = dict()
+        # the inverse of _name_map as TransactionMap.name_to_id resolves it, which
+        # differs from _id_map once a file is renamed onto an existing path
+        self._name_to_id: dict[FileName, FileNumber] = dict()
         self._transactions: list[Commit] = []
+        # keyed by the code stored in the commit log, so rows are dispatched
+        # without first being converted back into a ModificationType. Handlers are
+        # given the row along with its stripped file name
         self._mapping: dict[
-            pydriller.ModificationType,
-            Callable[[FileChanges], Optional[CommitFileChange]],
+            str, Callable[[FileChanges, str], Optional[CommitFileChange]]
         ] = {
-            pydriller.ModificationType.ADD: self._add,
-            pydriller.ModificationType.COPY: self._copy,
-            pydriller.ModificationType.DELETE: self._delete,
-            pydriller.ModificationType.MODIFY: self._modify,
-            pydriller.ModificationType.RENAME: self._rename,
-            pydriller.ModificationType.UNKNOWN: self._unknown,
+            modification_map[pydriller.ModificationType.ADD]: self._add,
+            modification_map[pydriller.ModificationType.COPY]: self._copy,
+            modification_map[pydriller.ModificationType.DELETE]: self._delete,
+            modification_map[pydriller.ModificationType.MODIFY]: self._modify,
+            modification_map[pydriller.ModificationType.RENAME]: self._rename,
+            modification_map[pydriller.ModificationType.UNKNOWN]: self._unknown,
         }
         self._commit_number = 0
+        # method and class lists repeat heavily across the log, so each distinct
+        # string is split once and its set is shared between the changes
+        self._split_cache: dict[str, frozenset[str]] = dict()
+        # changes are immutable, so commits repeating the same modification of a
+        # file share a single instance
+        self._modifications: dict[
+            tuple[FileNumber, frozenset[str], frozenset[str]], CommitFileChange
+        ] = dict()
 
     @staticmethod
     def group_file_changes(
-        changes: list[FileChanges],
-    ) -> list[tuple[str, list[FileChanges]]]:
-        return [
-            (commit, list(changes))
-            for commit, changes in itertools.groupby(
-                changes, operator.itemgetter("hash")
-            )
-        ]
+        changes: Iterable[FileChanges],
+    ) -> Iterator[tuple[str, Iterator[FileChanges]]]:
+        """Groups the changes by commit lazily, each group is only valid until the
+        next one is drawn, so they are to be consumed in order"""
+        return itertools.groupby(changes, operator.itemgetter("hash"))
 
     @staticmethod
     def build_from_groups(
-        commits: list[tuple[str, list[FileChanges]]],
+        commits: Iterable[tuple[str, Iterable[FileChanges]]],
     ) -> TransactionLog:
         builder = TransactionBuilder()
         for _, changes in commits:
@@ -130,86 +186,110 @@ class TransactionBuilder:
         result = builder.build()
         return TransactionLog(transactions=result.transactions, mapping=result.mapping)
 
-    def process(self, commit: list[FileChanges]):
+    def process(self, commit: Iterable[FileChanges]):
         items: list[CommitFileChange] = []
+        mapping = self._mapping
         for file in commit:
             if not file["file"]:
                 continue  # empty commit
 
-            modification_type = reverse_modification_map[file["modification_type"]]
-            item = self._mapping[modification_type](file)
+            item = mapping[file["modification_type"]](file, file["file"].strip())
             if item:
                 items.append(item)
         if not items:
             return
-        self._transactions.append(
-            Commit(number=self._commit_number, files=sorted(items))
-        )
+        items.sort(key=file_number_of)
+        self._transactions.append(Commit(number=self._commit_number, files=items))
         self._commit_number += 1
 
-    def _unknown(self, _: FileChanges) -> None:
+    def _register(self, file_name: FileName) -> FileNumber:
+        file_number = self._id_counter = FileNumber(self._id_counter + 1)
+        self._name_map[file_number] = [file_name]
+        self._id_map[file_name] = file_number
+        self._name_to_id[file_name] = file_number
+        return file_number
+
+    def _unknown(self, *_: object) -> None:
         return None
 
-    def _delete(self, _: FileChanges) -> CommitFileChange | None:
+    def _delete(self, *_: object) -> CommitFileChange | None:
         return None
 
-    def _add(self, file: FileChanges) -> CommitFileChange:
-        file_name: FileName = FileName(file["file"].strip())
+    def _add(self, file: FileChanges, name: str) -> CommitFileChange:
+        file_name: FileName = FileName(sys.intern(name))
         if file_name in self._id_map:
-            return self._modify(file)
-        self._id_counter = FileNumber(1 + self._id_counter)
-        self._name_map[self._id_counter] = [file_name]
-        self._id_map[file_name] = self._id_counter
+            return self._modify(file, file_name)
         return CommitFileChange(
-            file_number=self._id_counter,
+            file_number=self._register(file_name),
             modification_type=pydriller.ModificationType.ADD,
-            new_methods=set(),
-            classes_used=set(),
+            new_methods=frozenset(),
+            classes_used=frozenset(),
         )
 
-    def _modify(self, file: FileChanges) -> CommitFileChange:
-        file_name: FileName = FileName(file["file"].strip())
-        new_methods = set(file["new_methods"].split("|"))
-        classes_used = set(file["classes_used"].split("|"))
-        if file_name not in self._id_map:
-            return self._add(file)
-        return CommitFileChange(
-            file_number=self._id_map[file_name],
-            modification_type=pydriller.ModificationType.MODIFY,
-            new_methods=new_methods,
-            classes_used=classes_used,
-        )
-
-    def _rename(self, file: FileChanges) -> CommitFileChange:
-        old_name, new_name = map(FileName, file["file"].strip().split("|"))
-        if old_name not in self._id_map:
-            self._add({**file, "file": old_name})
-        file_number = self._id_map[old_name]
+    def _modify(self, file: FileChanges, name: str) -> CommitFileChange:
+        file_name: FileName = FileName(sys.intern(name))
+        file_number = self._id_map.get(file_name)
+        if file_number is None:
+            return self._add(file, file_name)
+        new_methods = self._split(file["new_methods"])
+        classes_used = self._split(file["classes_used"])
+        key = (file_number, new_methods, classes_used)
+        change = self._modifications.get(key)
+        if change is None:
+            change = self._modifications[key] = CommitFileChange(
+                file_number=file_number,
+                modification_type=pydriller.ModificationType.MODIFY,
+                new_methods=new_methods,
+                classes_used=classes_used,
+            )
+        return change
+
+    def _split(self, values: str) -> frozenset[str]:
+        split = self._split_cache.get(values)
+        if split is None:
+            split = self._split_cache[values] = frozenset(values.split("|"))
+        return split
+
+    def _rename(self, file: FileChanges, names: str) -> CommitFileChange:
+        old, _, new = names.partition("|")
+        old_name, new_name = FileName(sys.intern(old)), FileName(sys.intern(new))
+        file_number = self._id_map.get(old_name)
+        if file_number is None:
+            file_number = self._add(file, old_name).file_number
         self._name_map[file_number].append(new_name)
         self._id_map[new_name] = file_number
+        if self._name_to_id.get(new_name, 0) < file_number:
+            self._name_to_id[new_name] = file_number
         return CommitFileChange(
             file_number=file_number,
             modification_type=pydriller.ModificationType.MODIFY,
-            new_methods=set(),
-            classes_used=set(),
+            new_methods=frozenset(),
+            classes_used=frozenset(),
         )
 
-    def _copy(self, file: FileChanges) -> CommitFileChange:
-        file_name: FileName = FileName(file["file"].strip())
-        self._id_counter = FileNumber(1 + self._id_counter)
-        self._name_map[self._id_counter] = [file_name]
-        self._id_map[file_name] = self._id_counter
+    def _copy(self, _: FileChanges, name: str) -> CommitFileChange:
+        file_name: FileName = FileName(sys.intern(name))
         return CommitFileChange(
-            file_number=self._id_counter,
+            file_number=self._register(file_name),
             modification_type=pydriller.ModificationType.MODIFY,
-            new_methods=set(),
-            classes_used=set(),
+            new_methods=frozenset(),
+            classes_used=frozenset(),
         )
 
     def build(self) -> TransactionBuilderResult:
+        # the builder only stores commits, file numbers and names, so the models are
+        # constructed without revalidating every entry
+        # copied, as the builder goes on appending to the lists of renamed files
+        mapping = TransactionMap.model_construct(
+            id_to_names={
+                file_number: list(names)
+                for file_number, names in self._name_map.items()
+            }
+        )
+        mapping._name_to_id = dict(self._name_to_id)
         return TransactionBuilderResult(
-            transactions=Transactions(commits=self._transactions),
-            mapping=TransactionMap(id_to_names=self._name_map),
+            transactions=Transactions.model_construct(commits=self._transactions),
+            mapping=mapping,
         )
 
 
@@ -223,10 +303,12 @@ class TransactionLog(BaseModel):
         aligner = CommitAligner(
             [(commit, list(changes)) for commit, changes in commits]
         )
-        return cls.build_transactions_from_groups(list(aligner))
+        return cls.build_transactions_from_groups(aligner)
 
     @classmethod
-    def build_transactions_from_groups(cls, commits: list[list[FileChanges]]) -> Self:
+    def build_transactions_from_groups(
+        cls, commits: Iterable[Iterable[FileChanges]]
+    ) -> Self:
         builder = TransactionBuilder()
         for changes in commits:
             builder.process(changes)
@@ -237,6 +319,6 @@ class TransactionLog(BaseModel):
     @classmethod
     def from_commit_log(cls, rows: list[FileChanges]) -> Self:
         commits = itertools.groupby(rows, operator.itemgetter("hash"))
-        return cls.build_transactions_from_groups(
-            [list(changes) for _, changes in commits]
-        )
+        # the builder consumes each group before the next is drawn, so the groups
+        # are streamed into it rather than materialized
+        return cls.build_transactions_from_groups(changes for _, changes in commits)
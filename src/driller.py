@@ -1,12 +1,16 @@
 import csv
 import json
-from typing import Generator, NamedTuple, Optional, Sequence, Type
+import os
+import re
+import tempfile
+from typing import Callable, Generator, NamedTuple, Optional, Sequence, Type
 
 import pydriller
 import rich
 import rich.progress
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from git import Repo
+from pydantic import BaseModel, RootModel, ValidationError
 from urllib3 import request
 
 from src.custom_types.commit import CommitProtocol, ModifiedFileProtocol
@@ -18,22 +22,74 @@ from src.discriminators.binding.repositories.languages.language import Language
 from src.discriminators.transaction import modification_map
 from src.squash_reverse import UnSquashedCommit, expand_squash_merge, get_squash_merges
 
+COMMIT_LOG_FIELDS = (
+    "hash",
+    "parents",
+    "file",
+    "modification_type",
+    "new_methods",
+    "classes_used",
+)
+WRITE_BUFFER_SIZE = 1 << 20
+LAST_PAGE_PATTERN = re.compile(r'[?&]page=(\d+)>; rel="last"')
+
 
 class RemoteRepositoryInformation(NamedTuple):
     org: str
     name: str
 
 
+class CommitCount(BaseModel):
+    head: str
+    count: int
+
+
+class CommitCounts(RootModel[dict[str, CommitCount]]):
+    """The commit count of each local repository, keyed by its absolute path, along
+    with the head of the branch it was counted at"""
+
+
+def parse_repo_information(url: str) -> RemoteRepositoryInformation:
+    chunks = url.split(".git")[0].split("/")
+    return RemoteRepositoryInformation(org=chunks[-2], name=chunks[-1])
+
+
+def fetch_number_of_commits_from_api(url: str) -> Optional[int]:
+    """Counts the commits on the default branch through the GitHub REST API. The
+    commits are requested one per page, so the last page is the commit count
+
+    Args:
+        url (str): The url of the remote repository
+
+    Returns (Optional[int]): The number of commits, or None if the API refused
+    """
+    org, name = parse_repo_information(url)
+    response = request(
+        method="GET",
+        url=f"https://api.github.com/repos/{org}/{name}/commits",
+        fields={"per_page": "1"},
+        headers={"Accept": "application/vnd.github+json"},
+    )
+    if response.status != 200:
+        return None
+    last_page = LAST_PAGE_PATTERN.search(response.headers.get("Link", ""))
+    if last_page is None:
+        return len(json.loads(response.data))  # a single page of at most 1 commit
+    return int(last_page.group(1))
+
+
 def fetch_number_of_commits(url: str) -> Optional[int]:
     response = request(method="GET", url=url)
     if response.status != 200:
         return 0
-    soup = BeautifulSoup(response.data, "html.parser")
-
-    scripts = soup.find_all(
+    # only the embedded data scripts are parsed into the tree, rather than the page
+    embedded_data = SoupStrainer(
         "script",
         {"data-target": "react-partial.embeddedData", "type": "application/json"},
     )
+    soup = BeautifulSoup(response.data, "html.parser", parse_only=embedded_data)
+
+    scripts = soup.find_all("script")
 
     if not scripts:
         return None
@@ -67,62 +123,141 @@ def get_new_methods(
     return plus_methods - minus_methods
 
 
-def get_new_methods_from_file(
-    file: ModifiedFileProtocol, delimiter: str, language: Type[Language]
-) -> str:
-    if file.change_type == pydriller.ModificationType.MODIFY:
+def get_source_diff(
+    file: ModifiedFileProtocol,
+    change_type: pydriller.ModificationType,
+    language: Type[Language],
+) -> Optional[dict[str, list[tuple[int, str]]]]:
+    """Parses the diff of a modified source file, which is shared by the method and
+    class extraction as pydriller parses the diff again on every access
+
+    Returns (Optional[dict[str, list[tuple[int, str]]]]): The added and deleted
+        lines, or None if the file is not a modified source file
+    """
+    if change_type == pydriller.ModificationType.MODIFY:
         assert file.new_path is not None
         if file.new_path.endswith(language.SUFFIX):
-            added_methods = get_new_methods(file.diff_parsed, language)
-            return delimiter.join(added_methods)
-    return ""
+            return file.diff_parsed
+    return None
+
+
+def get_new_methods_from_file(
+    diff: Optional[dict[str, list[tuple[int, str]]]],
+    delimiter: str,
+    language: Type[Language],
+) -> str:
+    if diff is None:
+        return ""
+    return delimiter.join(get_new_methods(diff, language))
 
 
 def get_classes_used_from_file(
-    file: ModifiedFileProtocol, delimiter: str, language: Type[Language]
+    diff: Optional[dict[str, list[tuple[int, str]]]],
+    delimiter: str,
+    language: Type[Language],
 ) -> str:
-    if file.change_type == pydriller.ModificationType.MODIFY:
-        assert file.new_path is not None
-        if file.new_path.endswith(language.SUFFIX):
-            classes_referenced = language.get_classes_used(file.diff_parsed)
-            return delimiter.join(classes_referenced)
-    return ""
-
-
-def format_file(file: ModifiedFileProtocol, delimiter: str = "|") -> str:
-    if file.change_type == pydriller.ModificationType.RENAME:
-        return f"{file.old_path}{delimiter}{file.new_path}"
-    elif file.change_type == pydriller.ModificationType.DELETE:
-        assert file.old_path is not None, "Old path should be set for deletion"
-        return file.old_path
-    elif (
-        file.change_type == pydriller.ModificationType.ADD
-        or file.change_type == pydriller.ModificationType.COPY
-        or file.change_type == pydriller.ModificationType.UNKNOWN
-    ):
-        assert file.new_path
-        return file.new_path
-    elif file.change_type == pydriller.ModificationType.MODIFY:
-        assert file.new_path
-        return file.new_path
-
-    assert False, f"Unknown change type: {file.change_type}"
-
-
-def get_commit_count(path: str) -> int:
+    if diff is None:
+        return ""
+    return delimiter.join(language.get_classes_used(diff))
+
+
+def _format_renamed_file(file: ModifiedFileProtocol, delimiter: str) -> str:
+    return f"{file.old_path}{delimiter}{file.new_path}"
+
+
+def _format_deleted_file(file: ModifiedFileProtocol, _: str) -> str:
+    assert file.old_path is not None, "Old path should be set for deletion"
+    return file.old_path
+
+
+def _format_changed_file(file: ModifiedFileProtocol, _: str) -> str:
+    assert file.new_path
+    return file.new_path
+
+
+file_formatters: dict[
+    pydriller.ModificationType, Callable[[ModifiedFileProtocol, str], str]
+] = {
+    pydriller.ModificationType.RENAME: _format_renamed_file,
+    pydriller.ModificationType.DELETE: _format_deleted_file,
+    pydriller.ModificationType.ADD: _format_changed_file,
+    pydriller.ModificationType.COPY: _format_changed_file,
+    pydriller.ModificationType.UNKNOWN: _format_changed_file,
+    pydriller.ModificationType.MODIFY: _format_changed_file,
+}
+
+
+def format_file(
+    file: ModifiedFileProtocol,
+    change_type: pydriller.ModificationType,
+    delimiter: str = "|",
+) -> str:
+    formatter = file_formatters.get(change_type)
+    assert formatter is not None, f"Unknown change type: {change_type}"
+    return formatter(file, delimiter)
+
+
+def get_commit_count(path: str, cache: Optional[str] = None) -> int:
+    """Counts the commits on the default branch of the repository
+
+    Args:
+        path (str): The url of the remote repository, or the path to a local one
+        cache (Optional[str]): The file holding the counts of local repositories,
+            which are reused until the head of their branch moves
+
+    Returns (int): The number of commits
+    """
     if pydriller.Repository._is_remote(path):
-        commits = fetch_number_of_commits(path)
+        commits = fetch_number_of_commits_from_api(path)
+        if commits is None:
+            # the API is rate limited, so fall back to the repository page
+            commits = fetch_number_of_commits(path)
         assert commits is not None, "Failed to fetch commit count"
         return commits
 
     repo = Repo(path)
     branch = repo.active_branch
-    return sum(1 for _ in repo.iter_commits(branch))
+    if cache is None:
+        return int(repo.git.rev_list("--count", branch.name))
+
+    # each repository keeps a single entry, replaced whenever its branch moves
+    key = os.path.abspath(path)
+    head = branch.commit.hexsha
+    counts = read_commit_counts(cache)
+    entry = counts.get(key)
+    if entry is None or entry.head != head:
+        entry = counts[key] = CommitCount(
+            head=head, count=int(repo.git.rev_list("--count", branch.name))
+        )
+        write_commit_counts(cache, counts)
+    return entry.count
+
+
+def read_commit_counts(cache: str) -> dict[str, CommitCount]:
+    try:
+        with open(cache, "r") as f:
+            return CommitCounts.model_validate_json(f.read()).root
+    except (OSError, ValidationError):
+        return {}  # missing, unreadable or malformed caches are counted afresh
+
+
+def write_commit_counts(cache: str, counts: dict[str, CommitCount]) -> None:
+    directory = os.path.dirname(os.path.abspath(cache))
+    os.makedirs(directory, exist_ok=True)
+    # written beside the cache and moved over it, so that a concurrent drill never
+    # reads a partially written file
+    descriptor, temporary = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "w") as f:
+            f.write(CommitCounts(counts).model_dump_json())
+        os.replace(temporary, cache)
+    except BaseException:
+        os.remove(temporary)
+        raise
 
 
 def get_repo_information(path: str) -> RemoteRepositoryInformation:
-    chunks = Repo(path).remotes.origin.url.split(".git")[0].split("/")
-    return RemoteRepositoryInformation(org=chunks[-2], name=chunks[-1])
+    return parse_repo_information(Repo(path).remotes.origin.url)
 
 
 def stiched_commits(
@@ -153,12 +288,11 @@ def stiched_commits(
         }
 
     for commit in pydriller.Repository(path, order="topo-order").traverse_commits():
-        if commit.hash in hash_to_commits:
-            yield from hash_to_commits[commit.hash]
+        expanded = hash_to_commits.get(commit.hash)
+        if expanded is not None:
+            yield from expanded
             yield UnSquashedCommit(
-                [],
-                commit.hash,
-                commit.parents + [hash_to_commits[commit.hash][-1].hash],
+                [], commit.hash, [*commit.parents, expanded[-1].hash]
             )
         else:
             yield commit
@@ -170,58 +304,46 @@ def drill_repository(
     progress: rich.progress.Progress,
     reverse_squash_merge: bool,
     delimiter: str = "|",
+    commit_count_cache: Optional[str] = None,
 ) -> None:
-    commit_count = get_commit_count(path)
+    commit_count = get_commit_count(path, commit_count_cache)
     repo_information = get_repo_information(path)
     language = language_factory[
         get_repository_language(f"{repo_information.org}/{repo_information.name}")
     ]
 
-    with open(output_file, "w") as f:
+    # rows are written in commit sized batches through a large buffer, as the
+    # per row writes otherwise dominate on long histories
+    with open(output_file, "w", newline="", buffering=WRITE_BUFFER_SIZE) as f:
         task = progress.add_task(
             f"Fetching commits for [cyan]{path}[/cyan]", total=commit_count
         )
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "hash",
-                "parents",
-                "file",
-                "modification_type",
-                "new_methods",
-                "classes_used",
-            ],
-        )
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(COMMIT_LOG_FIELDS)
         for commit in stiched_commits(path, progress, reverse_squash_merge):
             progress.advance(task)
-
-            if not commit.modified_files:
-                writer.writerow(
-                    {
-                        "hash": commit.hash,
-                        "parents": delimiter.join(commit.parents),
-                        "file": "",
-                        "modification_type": "",
-                        "new_methods": "",
-                        "classes_used": "",
-                    }
-                )
-
-            for file in commit.modified_files:
-                writer.writerow(
-                    {
-                        "hash": commit.hash,
-                        "parents": delimiter.join(commit.parents),
-                        "file": format_file(file, delimiter),
-                        "modification_type": modification_map[file.change_type],
-                        "new_methods": get_new_methods_from_file(
-                            file, delimiter, language
-                        ),
-                        "classes_used": get_classes_used_from_file(
-                            file, delimiter, language
-                        ),
-                    }
+            parents = delimiter.join(commit.parents)
+            # pydriller runs a git diff of the commit on every access
+            modified_files = commit.modified_files
+
+            if not modified_files:
+                writer.writerow((commit.hash, parents, "", "", "", ""))
+
+            rows = []
+            for file in modified_files:
+                # pydriller derives the change type from the diff on every access
+                change_type = file.change_type
+                diff = get_source_diff(file, change_type, language)
+                rows.append(
+                    (
+                        commit.hash,
+                        parents,
+                        format_file(file, change_type, delimiter),
+                        modification_map[change_type],
+                        get_new_methods_from_file(diff, delimiter, language),
+                        get_classes_used_from_file(diff, delimiter, language),
+                    )
                 )
+            writer.writerows(rows)
 
         progress.tasks[task].visible = False
@@ -0,0 +1,87 @@
+from src.discriminators.align import CommitAligner
+from src.discriminators.file_types import FileChanges
+
+
+def generate_commit(c_hash: str, parents: list[str]) -> tuple[str, list[FileChanges]]:
+    return c_hash, [
+        FileChanges(
+            hash=c_hash,
+            modification_type="M",
+            file=f"{c_hash}.java",
+            parents="|".join(parents),
+            new_methods="",
+            classes_used="",
+        )
+    ]
+
+
+def aligned_hashes(commits: list[tuple[str, list[FileChanges]]]) -> list[str]:
+    return [changes[0]["hash"] for changes in CommitAligner(commits)]
+
+
+def test_linear_history_is_unchanged():
+    commits = [
+        generate_commit("W", []),
+        generate_commit("X", ["W"]),
+        generate_commit("Y", ["X"]),
+    ]
+    assert aligned_hashes(commits) == ["W", "X", "Y"]
+
+
+def test_iterating_yields_the_changes_of_each_commit():
+    commits = [generate_commit("W", []), generate_commit("X", ["W"])]
+    aligner = CommitAligner(commits)
+    assert list(aligner) == [changes for _, changes in commits]
+    assert list(aligner) == list(aligner), "each iteration walks the branch again"
+
+
+def test_branch_is_inlined_before_its_merge():
+    #   B----->C----->D
+    #   ^             |
+    #   |             v
+    #   W------------>X----->Y
+    commits = [
+        generate_commit("W", []),
+        generate_commit("B", ["W"]),
+        generate_commit("C", ["B"]),
+        generate_commit("D", ["C"]),
+        generate_commit("X", ["W", "D"]),
+        generate_commit("Y", ["X"]),
+    ]
+    assert aligned_hashes(commits) == ["W", "B", "C", "D", "X", "Y"]
+
+
+def test_branch_off_branch_is_inlined():
+    #            F-------->G-------->H
+    #            ^                   |
+    #            |                   |
+    #     B----->C----->D---->E      |
+    #     ^                   |      |
+    #     |                   v      v
+    #     W-------->X-------->Y----->Z
+    commits = [
+        generate_commit("W", []),
+        generate_commit("B", ["W"]),
+        generate_commit("X", ["W"]),
+        generate_commit("C", ["B"]),
+        generate_commit("D", ["C"]),
+        generate_commit("F", ["C"]),
+        generate_commit("E", ["D"]),
+        generate_commit("G", ["F"]),
+        generate_commit("Y", ["X", "E"]),
+        generate_commit("H", ["G"]),
+        generate_commit("Z", ["Y", "H"]),
+    ]
+    assert aligned_hashes(commits) == [
+        "W",
+        "X",
+        "B",
+        "C",
+        "D",
+        "E",
+        "Y",
+        "F",
+        "G",
+        "H",
+        "Z",
+    ]
@@ -1,3 +1,4 @@
+import warnings
 from collections import defaultdict
 from dataclasses import dataclass
 from functools import cached_property
@@ -5,6 +6,7 @@ from typing import Type
 
 from pydriller import ModificationType as modification_type
 
+from src.discriminators import commit_seq_discriminator
 from src.discriminators.binding.file_types import (
     FileName,
     ProgramFile,
@@ -16,7 +18,13 @@ from src.discriminators.binding.repositories.languages.java import JavaLanguage
 from src.discriminators.binding.repositories.languages.language import Language
 from src.discriminators.binding.repositories.repository import Files, RepositoryProtocol
 from src.discriminators.binding.strategy import BindingStrategy
-from src.discriminators.commit_seq_discriminator import CommitSequenceDiscriminator
+from src.discriminators.commit_seq_discriminator import (
+    TESTED_BEFORE,
+    TESTED_SAME_COMMIT,
+    UNTESTED,
+    CommitSequenceDiscriminator,
+    track_windows,
+)
 from src.discriminators.file_types import FileChanges
 from src.discriminators.transaction import (
     FileNumber,
@@ -579,3 +587,74 @@ def test_end_when_file_deleted():
     assert len(stats_sourceA.changed_tests_per_commit) == 1
     assert list(stats_sourceA.changed_tests_per_commit.values())[0] == {testA: [0]}
     assert stats_sourceA.same_commit() == 1.0
+
+
+def test_track_windows_boundaries():
+    # the windows are (-inf, 2] and (2, 5], the addition at 6 is after the last
+    stats = track_windows([2, 5], [(testA, [0, 2, 3, 5, 6])])
+    assert stats.changed_tests_per_commit == {2: {testA: [0, 2]}, 5: {testA: [3, 5]}}
+    assert stats.outcomes == bytearray([TESTED_SAME_COMMIT, TESTED_SAME_COMMIT])
+    assert stats.is_tfd(1.0)
+    assert stats.same_commit() == 1.0
+
+
+def test_track_windows_same_commit_and_before():
+    stats = track_windows([1, 3, 6], [(testA, [3]), (testAB, [0, 5])])
+    assert stats.changed_tests_per_commit == {
+        1: {testAB: [0]},
+        3: {testA: [3]},
+        6: {testAB: [5]},
+    }
+    assert stats.outcomes == bytearray(
+        [TESTED_BEFORE, TESTED_SAME_COMMIT, TESTED_BEFORE]
+    )
+    assert stats.same_commit() == 1 / 3
+
+
+def test_track_windows_test_touched_after_source():
+    stats = track_windows([1, 4], [(testA, [6]), (testB, [])])
+    assert stats.changed_tests_per_commit == {1: {}, 4: {}}
+    assert stats.outcomes == bytearray([UNTESTED, UNTESTED])
+    assert stats.tfd_count == 0
+    assert not stats.is_tfd(0.5)
+
+
+def test_track_windows_partially_tested():
+    stats = track_windows([2, 4, 8, 9], [(testA, [1, 7])])
+    assert stats.outcomes == bytearray(
+        [TESTED_BEFORE, UNTESTED, TESTED_BEFORE, UNTESTED]
+    )
+    assert not stats.is_tfd(1.0)
+    assert stats.is_tfd(0.5)
+    assert not stats.is_tfd(0.75)
+    assert stats.same_commit() == 0
+
+
+def test_parallel_statistics_match_serial(monkeypatch):
+    sources = [SourceFile("", f"{name}-source.java") for name in "CDEFGH"]
+    tests = [TestFile("", f"{names}-test.java") for names in ("CD", "E", "FGH", "HC")]
+    commit_list = [
+        {(tests[0], modification_type.ADD), (tests[3], modification_type.ADD)},
+        {(source, modification_type.ADD) for source in sources},
+    ]
+    for commit_no, file in enumerate(sources + tests + sources):
+        methods = frozenset({"method"}) if commit_no % 3 else frozenset()
+        commit_list.append({(file, (modification_type.MODIFY, methods, frozenset()))})
+        if commit_no % 4 == 0:
+            commit_list[-1].add(
+                (tests[2], (modification_type.MODIFY, frozenset({"m"}), frozenset()))
+            )
+    commit_data, binding_strategy = generate({*sources, *tests}, commit_list)
+
+    serial = CommitSequenceDiscriminator(commit_data, binding_strategy).statistics
+    monkeypatch.setattr(commit_seq_discriminator, "PARALLEL_THRESHOLD", 1)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        parallel = CommitSequenceDiscriminator(commit_data, binding_strategy).statistics
+
+    # forking once the progress bar's refresh thread is running risks deadlocks
+    assert not [warning for warning in caught if "fork()" in str(warning.message)]
+
+    assert len(serial.test_statistics) == len(sources)
+    assert parallel.test_statistics == serial.test_statistics
+    assert parallel.output() == serial.output()
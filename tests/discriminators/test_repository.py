@@ -0,0 +1,50 @@
+import os
+
+from src.discriminators.binding.file_types import SourceFile, TestFile
+from src.discriminators.binding.repositories.java import JavaRepository
+from src.discriminators.binding.repositories.repository import (
+    SOURCE_DIR,
+    TEST_DIR,
+    _all_files_in_directory,
+)
+
+SOURCE_CODE = "public class A {\n}\n"
+TEST_CODE = "public class ATest {\n@Test\npublic void test() {\n}\n}\n"
+
+SOURCES = [
+    os.path.join(SOURCE_DIR, "org", "A.java"),
+    os.path.join(SOURCE_DIR, "org", "a", "B.java"),
+    os.path.join(SOURCE_DIR, "org", "a", "b", "c", "C.java"),
+]
+TESTS = [
+    os.path.join(TEST_DIR, "org", "ATest.java"),
+    os.path.join(TEST_DIR, "org", "a", "b", "BTest.java"),
+]
+OTHERS = [os.path.join(SOURCE_DIR, "org", "a", "README.md"), "build.gradle"]
+
+
+def generate_repository(root: str) -> None:
+    for paths, code in ((SOURCES, SOURCE_CODE), (TESTS, TEST_CODE), (OTHERS, "")):
+        for path in paths:
+            os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+            with open(os.path.join(root, path), "w") as file:
+                file.write(code)
+
+
+def test_nested_files_are_listed_once(tmp_path):
+    root = str(tmp_path)
+    generate_repository(root)
+
+    paths = list(_all_files_in_directory(root, ".java"))
+    assert sorted(paths) == sorted(os.path.join(root, path) for path in SOURCES + TESTS)
+
+
+def test_nested_files_are_partitioned(tmp_path):
+    root = str(tmp_path)
+    generate_repository(root)
+
+    files = JavaRepository(root).files
+    assert files.source_files == {SourceFile(root, path) for path in SOURCES}
+    assert files.test_files == {TestFile(root, path) for path in TESTS}
+    assert all(type(file) is SourceFile for file in files.source_files)
+    assert all(type(file) is TestFile for file in files.test_files)
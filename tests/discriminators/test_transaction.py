@@ -0,0 +1,51 @@
+from pydriller import ModificationType as modification_type
+
+from src.discriminators.file_types import FileChanges
+from src.discriminators.transaction import (
+    FileNumber,
+    TransactionBuilder,
+    TransactionLog,
+    TransactionMap,
+    modification_map,
+)
+
+
+def generate_file_change(
+    c_hash: int, modification: modification_type, file: str
+) -> FileChanges:
+    return FileChanges(
+        hash=str(c_hash),
+        modification_type=modification_map[modification],
+        file=file,
+        parents=str(c_hash - 1) if c_hash > 0 else "",
+        new_methods="",
+        classes_used="",
+    )
+
+
+def test_rename_onto_existing_file():
+    rows = [
+        generate_file_change(0, modification_type.ADD, "a"),
+        generate_file_change(1, modification_type.ADD, "b"),
+        generate_file_change(2, modification_type.RENAME, "a|b"),
+    ]
+    mapping = TransactionLog.from_commit_log(rows).mapping
+    loaded = TransactionMap.model_validate_json(mapping.model_dump_json())
+
+    assert mapping.id_to_names == {
+        FileNumber(1): ["a", "b"],
+        FileNumber(2): ["b"],
+    }
+    assert mapping.name_to_id == {"a": FileNumber(1), "b": FileNumber(2)}
+    assert mapping.name_to_id == loaded.name_to_id
+
+
+def test_built_mapping_is_detached_from_builder():
+    builder = TransactionBuilder()
+    builder.process([generate_file_change(0, modification_type.ADD, "a")])
+    mapping = builder.build().mapping
+    builder.process([generate_file_change(1, modification_type.ADD, "b")])
+    builder.process([generate_file_change(2, modification_type.RENAME, "a|c")])
+
+    assert mapping.id_to_names == {FileNumber(1): ["a"]}
+    assert mapping.name_to_id == {"a": FileNumber(1)}
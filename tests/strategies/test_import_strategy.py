@@ -107,6 +107,11 @@ def test_correct_import_name():
     assert JavaLanguage.import_name_of(source_file) == "org.package.A"
 
 
+def test_import_name_only_strips_the_java_suffix():
+    source_file = generate_source_file("Parser.javacc.java", [])
+    assert JavaLanguage.import_name_of(source_file) == "org.package.Parser.javacc"
+
+
 def test_single_import_strategy():
     source_file = generate_source_file("B.java", [])
     test_file = generate_test_file("TestA.java", generate_test_code([source_file]))
@@ -0,0 +1,146 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import git
+import pytest
+
+from src import driller
+
+URL = "https://github.com/apache/kafka.git"
+API_URL = "https://api.github.com/repos/apache/kafka/commits"
+
+
+@dataclass(frozen=True)
+class MockResponse:
+    status: int
+    data: bytes = b"[]"
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def mock_request(monkeypatch: pytest.MonkeyPatch, response: MockResponse) -> list[str]:
+    urls: list[str] = []
+
+    def request(method: str, url: str, **_: object) -> MockResponse:
+        urls.append(url)
+        return response
+
+    monkeypatch.setattr(driller, "request", request)
+    return urls
+
+
+def link_header(last_page: int) -> str:
+    return (
+        f'<{API_URL}?per_page=1&page=2>; rel="next", '
+        f'<{API_URL}?per_page=1&page={last_page}>; rel="last"'
+    )
+
+
+def test_parse_repo_information():
+    assert driller.parse_repo_information(URL) == ("apache", "kafka")
+    assert driller.parse_repo_information(URL.removesuffix(".git")) == (
+        "apache",
+        "kafka",
+    )
+
+
+def test_api_commit_count_from_last_page(monkeypatch: pytest.MonkeyPatch):
+    urls = mock_request(
+        monkeypatch, MockResponse(status=200, headers={"Link": link_header(15032)})
+    )
+    assert driller.fetch_number_of_commits_from_api(URL) == 15032
+    assert urls == [API_URL]
+
+
+@pytest.mark.parametrize("commits", [[], [{"sha": "a"}]])
+def test_api_commit_count_without_link_header(
+    monkeypatch: pytest.MonkeyPatch, commits: list[dict[str, str]]
+):
+    mock_request(
+        monkeypatch, MockResponse(status=200, data=json.dumps(commits).encode())
+    )
+    assert driller.fetch_number_of_commits_from_api(URL) == len(commits)
+
+
+@pytest.mark.parametrize("status", [403, 404, 500])
+def test_api_commit_count_refused(monkeypatch: pytest.MonkeyPatch, status: int):
+    mock_request(
+        monkeypatch, MockResponse(status=status, headers={"Link": link_header(2)})
+    )
+    assert driller.fetch_number_of_commits_from_api(URL) is None
+
+
+@pytest.mark.parametrize("api_count, page_count", [(None, 42), (7, None)])
+def test_commit_count_falls_back_to_page(
+    monkeypatch: pytest.MonkeyPatch,
+    api_count: Optional[int],
+    page_count: Optional[int],
+):
+    monkeypatch.setattr(
+        driller, "fetch_number_of_commits_from_api", lambda _: api_count
+    )
+    monkeypatch.setattr(driller, "fetch_number_of_commits", lambda _: page_count)
+    assert driller.get_commit_count(URL) == (api_count or page_count)
+
+
+def generate_repository(path: str, commits: int) -> git.Repo:
+    repo = git.Repo.init(path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    for number in range(commits):
+        commit_repository(repo, number)
+    return repo
+
+
+def commit_repository(repo: git.Repo, number: int) -> None:
+    with open(os.path.join(repo.working_dir, "A.java"), "w") as f:
+        f.write(f"// {number}\n")
+    repo.index.add(["A.java"])
+    repo.index.commit(f"commit {number}")
+
+
+def read_cache(cache: str) -> dict[str, dict[str, object]]:
+    with open(cache, "r") as f:
+        return json.load(f)
+
+
+def test_commit_count_without_cache(tmp_path):
+    generate_repository(str(tmp_path / "repo"), 3)
+    assert driller.get_commit_count(str(tmp_path / "repo")) == 3
+    assert os.listdir(tmp_path) == ["repo"]
+
+
+def test_commit_count_cache_is_reused_until_head_moves(tmp_path):
+    path, cache = str(tmp_path / "repo"), str(tmp_path / "cache" / "counts.json")
+    repo = generate_repository(path, 2)
+
+    assert driller.get_commit_count(path, cache) == 2
+    assert read_cache(cache) == {
+        os.path.abspath(path): {"head": repo.head.commit.hexsha, "count": 2}
+    }
+
+    # a cached count at the same head is returned without counting again
+    with open(cache, "w") as f:
+        json.dump({path: {"head": repo.head.commit.hexsha, "count": 7}}, f)
+    assert driller.get_commit_count(path, cache) == 7
+
+    commit_repository(repo, 2)
+    assert driller.get_commit_count(path, cache) == 3
+    assert read_cache(cache) == {path: {"head": repo.head.commit.hexsha, "count": 3}}
+    assert os.listdir(tmp_path / "cache") == ["counts.json"]
+
+
+@pytest.mark.parametrize(
+    "contents",
+    ["", "not json", "[1, 2]", '{"repo": 3}', '{"repo": {"head": "a"}}'],
+)
+def test_malformed_commit_count_cache_is_replaced(tmp_path, contents: str):
+    path, cache = str(tmp_path / "repo"), str(tmp_path / "counts.json")
+    repo = generate_repository(path, 2)
+    with open(cache, "w") as f:
+        f.write(contents)
+
+    assert driller.get_commit_count(path, cache) == 2
+    assert read_cache(cache) == {path: {"head": repo.head.commit.hexsha, "count": 2}}